@@ -21,60 +21,117 @@ Usage:
 import subprocess
 import re
 import argparse
+import tempfile
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Optional
+from typing import Iterable, Optional, TextIO
 
 
-@dataclass
+@dataclass(slots=True)
 class ApiItem:
     """Represents a public API item."""
     kind: str  # fn, struct, enum, type, const, mod, trait
     path: str  # full path like oxidros_zenoh::Context
     signature: str  # full signature
+    simplified_signature: str  # signature without the crate prefix
     name: str  # short name like "new" or "Context"
     parent: str  # parent module/struct
+    normalized_path: str  # crate name replaced, like oxidros::Context
+    parts: tuple[str, ...]  # normalized path split on "::"
+    module: str  # first module after the crate, like "Context"
 
 
-def run_cargo_public_api(package: str, features: Optional[str] = None) -> str:
-    """Run cargo public-api and return output."""
+# Patterns for API lines like: pub fn oxidros_zenoh::Context::new() -> ...
+# or: pub struct oxidros_zenoh::Context
+API_PATTERNS = [
+    (re.compile(r"^pub (fn) (\S+::\S+)\((.*)"), "fn"),
+    (re.compile(r"^pub (struct) (\S+)"), "struct"),
+    (re.compile(r"^pub (enum) (\S+)"), "enum"),
+    (re.compile(r"^pub (type) (\S+)"), "type"),
+    (re.compile(r"^pub (const) (\S+)"), "const"),
+    (re.compile(r"^pub (mod) (\S+)"), "mod"),
+    (re.compile(r"^pub (trait) (\S+)"), "trait"),
+]
+
+# Impl blocks from dependencies
+DEPENDENCIES = [
+    "stabby_abi", "ppv_lite86", "crossbeam_epoch",
+    "zenoh_keyexpr", "asn1_rs", "typenum", "either",
+    "tracing::", "core::", "alloc::", "std::"
+]
+
+# Auto-derived trait methods
+AUTO_DERIVED_METHODS = [
+    "::borrow(", "::borrow_mut(", "::from(", "::into(",
+    "::try_from(", "::try_into(", "::type_id(",
+    "::clone(", "::clone_from(", "::default(",
+    "::eq(", "::ne(", "::partial_cmp(", "::cmp(",
+    "::hash(", "::fmt(",
+    # stabby_abi and other internal trait impls
+    "::guard_mut_inner(", "::guard_ref_inner(",
+    "::mut_as<", "::ref_as<", "::as_node(", "::as_node_mut(",
+    "::vzip(", "::to_owned(", "::clone_into(",
+    "::__clone_box(", "::deref(", "::deref_mut(",
+]
+
+# Type aliases for Error, Output, Guard, Init, Owned (from traits)
+TRAIT_TYPE_ALIASES = [
+    "::Error", "::Output", "::Guard<", "::GuardMut<",
+    "::Init", "::Owned", "::Request"
+]
+
+
+def substring_re(needles: list[str]) -> re.Pattern:
+    """Compile a regex matching any of the given substrings in one scan."""
+    # Longest first, so needles sharing a prefix try the longer one first
+    ordered = sorted(needles, key=len, reverse=True)
+    return re.compile("|".join(map(re.escape, ordered)))
+
+
+# Single-pass matchers for the substring lists above
+DEPENDENCY_RE = substring_re(DEPENDENCIES)
+AUTO_DERIVED_RE = substring_re(AUTO_DERIVED_METHODS)
+TRAIT_TYPE_ALIAS_RE = substring_re(TRAIT_TYPE_ALIASES)
+
+
+def run_cargo_public_api(
+    package: str, crate_name: str, features: Optional[str] = None
+) -> dict[str, ApiItem]:
+    """Run cargo public-api and extract API items while its output streams in."""
     cmd = ["cargo", "public-api", "-p", package]
     if features:
         cmd.extend(["--features", features])
     
-    result = subprocess.run(
-        cmd,
-        capture_output=True,
-        text=True,
-        cwd=Path(__file__).parent.parent
-    )
-    
-    if result.returncode != 0:
-        print(f"Warning: cargo public-api failed for {package}")
-        print(result.stderr)
-        return ""
+    # stderr goes to a file so a chatty build cannot block the stdout pipe
+    with tempfile.TemporaryFile(mode="w+") as stderr:
+        with subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            text=True,
+            cwd=Path(__file__).parent.parent
+        ) as proc:
+            apis = extract_apis(proc.stdout, crate_name)
+        
+        if proc.returncode != 0:
+            print(f"Warning: cargo public-api failed for {package}")
+            stderr.seek(0)
+            print(stderr.read())
+            return {}
     
-    return result.stdout
+    return apis
 
 
 def parse_api_line(line: str, crate_name: str) -> Optional[ApiItem]:
     """Parse a single API line into an ApiItem."""
-    # Match patterns like: pub fn oxidros_zenoh::Context::new() -> ...
-    # or: pub struct oxidros_zenoh::Context
+    # Cheap rejection of lines that cannot belong to our crate
+    if crate_name not in line:
+        return None
     
-    patterns = [
-        (r"^pub (fn) (\S+::\S+)\((.*)", "fn"),
-        (r"^pub (struct) (\S+)", "struct"),
-        (r"^pub (enum) (\S+)", "enum"),
-        (r"^pub (type) (\S+)", "type"),
-        (r"^pub (const) (\S+)", "const"),
-        (r"^pub (mod) (\S+)", "mod"),
-        (r"^pub (trait) (\S+)", "trait"),
-    ]
-    
-    for pattern, kind in patterns:
-        match = re.match(pattern, line)
+    for pattern, kind in API_PATTERNS:
+        match = pattern.match(line)
         if match:
             path = match.group(2)
             
@@ -83,34 +140,15 @@ def parse_api_line(line: str, crate_name: str) -> Optional[ApiItem]:
                 return None
             
             # Skip impl blocks from dependencies
-            if any(dep in path for dep in [
-                "stabby_abi", "ppv_lite86", "crossbeam_epoch", 
-                "zenoh_keyexpr", "asn1_rs", "typenum", "either",
-                "tracing::", "core::", "alloc::", "std::"
-            ]):
+            if DEPENDENCY_RE.search(path):
                 return None
             
             # Skip auto-derived trait methods
-            auto_derived_methods = [
-                "::borrow(", "::borrow_mut(", "::from(", "::into(",
-                "::try_from(", "::try_into(", "::type_id(",
-                "::clone(", "::clone_from(", "::default(",
-                "::eq(", "::ne(", "::partial_cmp(", "::cmp(",
-                "::hash(", "::fmt(",
-                # stabby_abi and other internal trait impls
-                "::guard_mut_inner(", "::guard_ref_inner(",
-                "::mut_as<", "::ref_as<", "::as_node(", "::as_node_mut(",
-                "::vzip(", "::to_owned(", "::clone_into(",
-                "::__clone_box(", "::deref(", "::deref_mut(",
-            ]
-            if any(m in line for m in auto_derived_methods):
+            if AUTO_DERIVED_RE.search(line):
                 return None
             
             # Skip type aliases for Error, Output, Guard, Init, Owned (from traits)
-            if kind == "type" and any(x in path for x in [
-                "::Error", "::Output", "::Guard<", "::GuardMut<", 
-                "::Init", "::Owned", "::Request"
-            ]):
+            if kind == "type" and TRAIT_TYPE_ALIAS_RE.search(path):
                 return None
             
             # Skip const ALIGN (from Pointable trait)
@@ -122,32 +160,39 @@ def parse_api_line(line: str, crate_name: str) -> Optional[ApiItem]:
             name = parts[-1] if parts else path
             parent = "::".join(parts[:-1]) if len(parts) > 1 else ""
             
+            # Use a normalized path for comparison
+            # Replace crate name with generic prefix
+            normalized_path = path.replace(crate_name, "oxidros")
+            normalized_parts = tuple(normalized_path.split("::"))
+            module = normalized_parts[1] if len(normalized_parts) > 1 else "root"
+            
             return ApiItem(
                 kind=kind,
                 path=path,
                 signature=line,
+                simplified_signature=line.replace(f"{crate_name}::", ""),
                 name=name,
-                parent=parent
+                parent=parent,
+                normalized_path=normalized_path,
+                parts=normalized_parts,
+                module=module
             )
     
     return None
 
 
-def extract_apis(output: str, crate_name: str) -> dict[str, ApiItem]:
-    """Extract API items from cargo public-api output."""
+def extract_apis(lines: Iterable[str], crate_name: str) -> dict[str, ApiItem]:
+    """Extract API items from cargo public-api output lines."""
     apis = {}
     
-    for line in output.splitlines():
+    for line in lines:
         line = line.strip()
         if not line.startswith("pub "):
             continue
         
         item = parse_api_line(line, crate_name)
         if item:
-            # Use a normalized key for comparison
-            # Replace crate name with generic prefix
-            normalized_path = item.path.replace(crate_name, "oxidros")
-            apis[normalized_path] = item
+            apis[item.normalized_path] = item
     
     return apis
 
@@ -158,11 +203,8 @@ def categorize_by_module(apis: dict[str, ApiItem]) -> dict[str, list[ApiItem]]:
     
     for item in apis.values():
         # Get the main module (e.g., Context, Node, topic::publisher)
-        parts = item.path.split("::")
-        if len(parts) >= 2:
-            # Skip crate name, get first module
-            module = parts[1] if len(parts) > 1 else "root"
-            by_module[module].append(item)
+        if len(item.parts) >= 2:
+            by_module[item.module].append(item)
     
     return by_module
 
@@ -178,6 +220,28 @@ def clean_module_name(module: str) -> str:
     return module
 
 
+def write_section(
+    f: TextIO,
+    entries: list[tuple[str, str, str, str]],
+    keys: set[str]
+) -> None:
+    """Write the entries whose key is in keys, grouped by module."""
+    current_module = None
+    for module, _, key, sig in entries:
+        if key not in keys:
+            continue
+        if module != current_module:
+            if current_module is not None:
+                f.write("```\n")
+            current_module = module
+            f.write(f"\n### {clean_module_name(module)}\n")
+            f.write("\n")
+            f.write("```rust\n")
+        f.write(f"{sig}\n")
+    if current_module is not None:
+        f.write("```\n")
+
+
 def generate_markdown(
     zenoh_apis: dict[str, ApiItem],
     wrapper_apis: dict[str, ApiItem],
@@ -193,109 +257,58 @@ def generate_markdown(
     zenoh_only = zenoh_keys - wrapper_keys
     wrapper_only = wrapper_keys - zenoh_keys
     
-    lines = [
-        "# Oxidros API Reference",
-        "",
-        "This document is auto-generated by `scripts/generate_api_docs.py`.",
-        "",
-        "## Summary",
-        "",
-        f"| Category | Count |",
-        f"|----------|-------|",
-        f"| Common APIs | {len(common)} |",
-        f"| Zenoh-only APIs | {len(zenoh_only)} |",
-        f"| Wrapper-only APIs | {len(wrapper_only)} |",
-        "",
-        "---",
-        "",
-    ]
-    
-    # Common APIs by category
-    lines.extend([
-        "## Common APIs (Both Backends)",
-        "",
-        "These APIs are available in both `oxidros-wrapper` and `oxidros-zenoh` with the same signature.",
-        "",
-    ])
-    
-    common_by_module = defaultdict(list)
-    for key in sorted(common):
-        item = zenoh_apis[key]
-        parts = key.split("::")
-        module = parts[1] if len(parts) > 1 else "root"
-        common_by_module[module].append(item)
-    
-    for module in sorted(common_by_module.keys()):
-        items = common_by_module[module]
-        lines.append(f"### {clean_module_name(module)}")
-        lines.append("")
-        lines.append("```rust")
-        for item in sorted(items, key=lambda x: x.name):
-            # Show simplified signature
-            sig = item.signature.replace("oxidros_zenoh::", "")
-            lines.append(sig)
-        lines.append("```")
-        lines.append("")
-    
-    # Zenoh-only APIs
-    lines.extend([
-        "---",
-        "",
-        "## Zenoh-Only APIs",
-        "",
-        "These APIs are specific to `oxidros-zenoh`.",
-        "",
-    ])
-    
-    zenoh_by_module = defaultdict(list)
-    for key in sorted(zenoh_only):
-        item = zenoh_apis[key]
-        parts = key.split("::")
-        module = parts[1] if len(parts) > 1 else "root"
-        zenoh_by_module[module].append(item)
-    
-    for module in sorted(zenoh_by_module.keys()):
-        items = zenoh_by_module[module]
-        lines.append(f"### {clean_module_name(module)}")
-        lines.append("")
-        lines.append("```rust")
-        for item in sorted(items, key=lambda x: x.name):
-            sig = item.signature.replace("oxidros_zenoh::", "")
-            lines.append(sig)
-        lines.append("```")
-        lines.append("")
-    
-    # Wrapper-only APIs
-    lines.extend([
-        "---",
-        "",
-        "## Wrapper-Only APIs",
-        "",
-        "These APIs are specific to `oxidros-wrapper` (RCL backend).",
-        "",
-    ])
-    
-    wrapper_by_module = defaultdict(list)
-    for key in sorted(wrapper_only):
-        item = wrapper_apis[key]
-        parts = key.split("::")
-        module = parts[1] if len(parts) > 1 else "root"
-        wrapper_by_module[module].append(item)
-    
-    for module in sorted(wrapper_by_module.keys()):
-        items = wrapper_by_module[module]
-        lines.append(f"### {clean_module_name(module)}")
-        lines.append("")
-        lines.append("```rust")
-        for item in sorted(items, key=lambda x: x.name):
-            sig = item.signature.replace("oxidros_wrapper::", "")
-            lines.append(sig)
-        lines.append("```")
-        lines.append("")
+    # Sort every item once; each section filters this list
+    entries = []
+    for key in zenoh_keys | wrapper_keys:
+        item = zenoh_apis[key] if key in zenoh_apis else wrapper_apis[key]
+        entries.append((item.module, item.name, key, item.simplified_signature))
+    entries.sort()
     
-    # Write output
+    # Write output directly, without building the document in memory
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(lines))
+    with output_path.open("w") as f:
+        f.write("# Oxidros API Reference\n")
+        f.write("\n")
+        f.write("This document is auto-generated by `scripts/generate_api_docs.py`.\n")
+        f.write("\n")
+        f.write("## Summary\n")
+        f.write("\n")
+        f.write("| Category | Count |\n")
+        f.write("|----------|-------|\n")
+        f.write(f"| Common APIs | {len(common)} |\n")
+        f.write(f"| Zenoh-only APIs | {len(zenoh_only)} |\n")
+        f.write(f"| Wrapper-only APIs | {len(wrapper_only)} |\n")
+        f.write("\n")
+        f.write("---\n")
+        f.write("\n")
+        
+        # Common APIs by category
+        f.write("## Common APIs (Both Backends)\n")
+        f.write("\n")
+        f.write("These APIs are available in both `oxidros-wrapper` and `oxidros-zenoh` with the same signature.\n")
+        
+        write_section(f, entries, common)
+        
+        # Zenoh-only APIs
+        f.write("\n")
+        f.write("---\n")
+        f.write("\n")
+        f.write("## Zenoh-Only APIs\n")
+        f.write("\n")
+        f.write("These APIs are specific to `oxidros-zenoh`.\n")
+        
+        write_section(f, entries, zenoh_only)
+        
+        # Wrapper-only APIs
+        f.write("\n")
+        f.write("---\n")
+        f.write("\n")
+        f.write("## Wrapper-Only APIs\n")
+        f.write("\n")
+        f.write("These APIs are specific to `oxidros-wrapper` (RCL backend).\n")
+        
+        write_section(f, entries, wrapper_only)
+    
     print(f"Generated: {output_path}")
 
 
@@ -318,16 +331,21 @@ def main():
     )
     args = parser.parse_args()
     
-    print("Extracting oxidros-zenoh API...")
-    zenoh_output = run_cargo_public_api("oxidros-zenoh")
-    zenoh_apis = extract_apis(zenoh_output, "oxidros_zenoh")
-    print(f"  Found {len(zenoh_apis)} API items")
-    
-    print("Extracting oxidros-wrapper API...")
+    # Both extractions are independent, so run cargo for them concurrently
+    print("Extracting oxidros-zenoh and oxidros-wrapper APIs...")
     wrapper_features = args.wrapper_features if args.wrapper_features else None
-    wrapper_output = run_cargo_public_api("oxidros-wrapper", wrapper_features)
-    wrapper_apis = extract_apis(wrapper_output, "oxidros_wrapper")
-    print(f"  Found {len(wrapper_apis)} API items")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        zenoh_future = executor.submit(
+            run_cargo_public_api, "oxidros-zenoh", "oxidros_zenoh"
+        )
+        wrapper_future = executor.submit(
+            run_cargo_public_api, "oxidros-wrapper", "oxidros_wrapper", wrapper_features
+        )
+        zenoh_apis = zenoh_future.result()
+        wrapper_apis = wrapper_future.result()
+    
+    print(f"  Found {len(zenoh_apis)} oxidros-zenoh API items")
+    print(f"  Found {len(wrapper_apis)} oxidros-wrapper API items")
     
     # Check for failures - successful extraction should have many items
     MIN_EXPECTED_APIS = 20  # Both crates should have at least this many APIs
@@ -1,77 +1,346 @@
 #!/usr/bin/env python3
 """
 Convert ROS2 IDL files to JSON format using rosidl_parser.
-This script parses IDL files and outputs a JSON representation.
+This script parses IDL files and outputs a JSON representation, indented
+when written to a terminal and compact otherwise.
+
+Set ROSIDL_CACHE_DIR to cache parse results on disk, keyed by IDL path and
+content.
+Pass --batch to convert many files in parallel, writing <stem>.json next to
+each IDL file, or under --output-dir.
 """
 
+import os
 import sys
+import argparse
+import contextlib
 import json
+import hashlib
+import tempfile
+import functools
+import collections
+import itertools
+import multiprocessing
 from pathlib import Path
-from rosidl_parser.parser import parse_idl_file
-from rosidl_parser.definition import IdlLocator
+
+try:
+    # Optional: much faster serialization than the json module
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_UNSET = object()
+
+# Bump when the JSON produced by object_to_dict changes
+CACHE_FORMAT_VERSION = 1
 
 
+@functools.lru_cache(maxsize=None)
 def get_all_slots(cls):
-    """Get all __slots__ from class and all parent classes."""
-    slots = []
-    for klass in cls.__mro__:
-        if hasattr(klass, "__slots__"):
-            s = klass.__slots__
-            # Handle both tuple/list and single string cases
-            if isinstance(s, str):
-                slots.append(s)
-            else:
-                slots.extend(s)
-    return slots
+    """Get all __slots__ from class and all parent classes.
+
+    Slots are static per type, so the result is cached per class.
+    """
+    # Only look at slots declared on each class itself, so inherited
+    # __slots__ attributes are not collected twice
+    declared = (vars(klass).get("__slots__", ()) for klass in cls.__mro__)
+    # Handle both tuple/list and single string cases
+    return tuple(itertools.chain.from_iterable(
+        (s,) if isinstance(s, str) else s for s in declared
+    ))
+
+
+def slot_items(obj):
+    """Yield (slot, value) pairs of a __slots__ object (including inherited)."""
+    for slot in get_all_slots(type(obj)):
+        # Single attribute lookup; unset slots return the sentinel
+        value = getattr(obj, slot, _UNSET)
+        if value is _UNSET:
+            continue
+        # Skip empty annotations lists
+        if slot == "annotations" and isinstance(value, (list, tuple)) and len(value) == 0:
+            continue
+        yield slot, value
+
+
+def _identity(obj):
+    return obj
+
+
+def _convert_sequence(obj):
+    return [object_to_dict(item) for item in obj]
+
+
+def _convert_dict(obj):
+    return {k: object_to_dict(v) for k, v in obj.items()}
+
+
+def _convert_slots(obj):
+    return {slot: object_to_dict(value) for slot, value in slot_items(obj)}
+
+
+# Converters by exact type; other types are resolved once and added here
+_CONVERTERS = {
+    type(None): _identity,
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    Path: str,
+    type(Path()): str,
+    list: _convert_sequence,
+    tuple: _convert_sequence,
+    dict: _convert_dict,
+}
+
+
+def _resolve_converter(cls):
+    """Pick the converter for a type not found in _CONVERTERS."""
+    if issubclass(cls, (str, int, float, bool)):
+        return _identity
+    elif issubclass(cls, Path):
+        return str
+    elif issubclass(cls, (list, tuple)):
+        return _convert_sequence
+    elif issubclass(cls, dict):
+        return _convert_dict
+    elif hasattr(cls, "__slots__"):
+        return _convert_slots
+    else:
+        return str
 
 
 def object_to_dict(obj):
     """Convert a Python object to a dictionary using __slots__ (including inherited)."""
-    if obj is None:
-        return None
-    elif isinstance(obj, (str, int, float, bool)):
-        return obj
-    elif isinstance(obj, Path):
+    cls = type(obj)
+    converter = _CONVERTERS.get(cls)
+    if converter is None:
+        converter = _CONVERTERS[cls] = _resolve_converter(cls)
+    return converter(obj)
+
+
+def json_default(obj):
+    """JSON encoder hook converting one level of a parsed IDL tree.
+
+    Lets the encoder walk the tree directly, so no intermediate dictionary
+    of the whole tree is built.
+    """
+    if isinstance(obj, Path):
         return str(obj)
+    elif isinstance(obj, float):
+        # orjson hands float subclasses to this hook; keep them numbers
+        return float(obj)
     elif isinstance(obj, (list, tuple)):
-        return [object_to_dict(item) for item in obj]
-    elif isinstance(obj, dict):
-        return {k: object_to_dict(v) for k, v in obj.items()}
+        # orjson hands tuple subclasses (e.g. namedtuples) to this hook
+        return list(obj)
     elif hasattr(obj, "__slots__"):
-        result = {}
-        # Include slots from all parent classes
-        for slot in get_all_slots(type(obj)):
-            if hasattr(obj, slot):
-                value = getattr(obj, slot)
-                # Skip empty annotations lists
-                if slot == "annotations" and isinstance(value, (list, tuple)) and len(value) == 0:
-                    continue
-                result[slot] = object_to_dict(value)
-        return result
+        return dict(slot_items(obj))
     else:
         return str(obj)
 
 
-def idl_to_json(idl_path):
-    """Parse IDL file and return JSON representation."""
+@functools.lru_cache(maxsize=None)
+def cache_tag():
+    """Return a tag identifying the JSON format of cache entries."""
+    # Imported here: loading importlib.metadata is slow and only needed
+    # when caching is enabled
+    import importlib.metadata
+
+    try:
+        rosidl_version = importlib.metadata.version("rosidl_parser")
+    except importlib.metadata.PackageNotFoundError:
+        rosidl_version = "unknown"
+    return f"{CACHE_FORMAT_VERSION}:{rosidl_version}"
+
+
+def cache_path(path):
+    """Return the cache file for an IDL file, or None if caching is disabled.
+
+    Caching is opt-in via the ROSIDL_CACHE_DIR environment variable. The key
+    covers the path as given as well as the content, since the locator is
+    part of the JSON output, and the format tag so entries written by other
+    versions of this script or rosidl_parser are not reused.
+    """
+    cache_dir = os.environ.get("ROSIDL_CACHE_DIR")
+    if not cache_dir:
+        return None
+    digest = hashlib.sha256()
+    digest.update(cache_tag().encode())
+    digest.update(b"\0")
+    digest.update(str(path).encode())
+    digest.update(b"\0")
+    digest.update(path.read_bytes())
+    return Path(cache_dir) / "idl_parse" / f"{digest.hexdigest()}.json"
+
+
+@contextlib.contextmanager
+def atomic_open(output_path):
+    """Open a temporary file that replaces output_path once fully written.
+
+    If writing fails, any existing output_path is left untouched.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=output_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            yield f
+        os.replace(tmp_name, output_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def write_cache(cache_file, data):
+    """Atomically write JSON data to the cache."""
+    with atomic_open(cache_file) as f:
+        json.dump(data, f)
+
+
+def parse_idl(idl_path):
+    """Parse IDL file and return the rosidl_parser tree."""
+    # Imported here: rosidl_parser is slow to load and not needed for usage
+    # errors or cache hits
+    from rosidl_parser.parser import parse_idl_file
+    from rosidl_parser.definition import IdlLocator
+
     path = Path(idl_path)
     basepath = path.parent
     relative_path = Path(path.name)
     locator = IdlLocator(basepath, relative_path)
-    idl_tree = parse_idl_file(locator)
-    return object_to_dict(idl_tree)
+    return parse_idl_file(locator)
 
 
-def main():
-    if len(sys.argv) < 2:
-        print(f"Usage: {sys.argv[0]} <idl-file>")
-        sys.exit(1)
+def idl_to_json(idl_path):
+    """Parse IDL file and return JSON representation."""
+    path = Path(idl_path)
+    cache_file = cache_path(path)
+    if cache_file is not None and cache_file.exists():
+        return json.loads(cache_file.read_text())
+
+    data = object_to_dict(parse_idl(path))
+
+    if cache_file is not None:
+        try:
+            write_cache(cache_file, data)
+        except OSError as e:
+            # The cache is an optimization; failing to fill it is not an error
+            print(f"Warning: could not write cache {cache_file}: {e}", file=sys.stderr)
+    return data
+
+
+def load_idl(idl_path):
+    """Return data ready for dump_json for an IDL file."""
+    if os.environ.get("ROSIDL_CACHE_DIR"):
+        return idl_to_json(idl_path)
+    # Encode straight from the parsed tree
+    return parse_idl(idl_path)
 
-    idl_file = sys.argv[1]
+
+def dump_json(data, f):
+    """Write JSON data (or a parsed IDL tree) to a text stream.
+
+    Output is pretty-printed for terminals and compact otherwise, since
+    piped output is read by tools. orjson and json produce the same bytes,
+    except that non-finite floats (NaN, Infinity) become null with orjson
+    but are written as the non-standard NaN/Infinity tokens by json.
+    """
+    pretty = f.isatty()
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        f.flush()
+        f.buffer.write(orjson.dumps(data, default=json_default, option=option))
+        return
+    # ensure_ascii=False matches orjson, which writes UTF-8 text as is
+    if pretty:
+        json.dump(data, f, indent=2, ensure_ascii=False, default=json_default)
+    else:
+        json.dump(
+            data, f, separators=(",", ":"), ensure_ascii=False, default=json_default
+        )
+    f.write("\n")
+
+
+def json_output_path(idl_path, output_dir=None):
+    """Return where batch mode writes the JSON for an IDL file.
+
+    Without output_dir this is <stem>.json next to the IDL file. With it,
+    the package and interface directories are mirrored, as in
+    <output_dir>/<pkg>/msg/<stem>.json, since stems repeat across packages.
+    """
+    path = Path(idl_path)
+    if output_dir is None:
+        return path.with_suffix(".json")
+    # Drop the anchor so shallow paths cannot replace output_dir
+    resolved = path.resolve()
+    tail = resolved.relative_to(resolved.anchor).parts[-3:]
+    return Path(output_dir).joinpath(*tail).with_suffix(".json")
+
+
+def write_json_file(idl_path, output_dir=None):
+    """Convert an IDL file and write the JSON to its json_output_path."""
+    output_path = json_output_path(idl_path, output_dir)
+    # Parse before touching the output so a failure keeps the previous file
+    data = load_idl(idl_path)
+    with atomic_open(output_path) as f:
+        dump_json(data, f)
+    return output_path
+
+
+def write_json_files(idl_paths, output_dir=None, processes=None):
+    """Convert many IDL files in parallel, returning the written paths.
+
+    Each worker writes its own output file, so parsed data is never sent
+    back to the parent process.
+    """
+    # Workers writing the same target would race, so refuse up front
+    targets = collections.defaultdict(list)
+    for idl_path in idl_paths:
+        targets[json_output_path(idl_path, output_dir).resolve()].append(idl_path)
+    duplicates = {t: p for t, p in targets.items() if len(p) > 1}
+    if duplicates:
+        details = "; ".join(
+            f"{target} <- {', '.join(map(str, paths))}"
+            for target, paths in duplicates.items()
+        )
+        raise ValueError(f"Multiple IDL files map to the same output: {details}")
+
+    worker = functools.partial(write_json_file, output_dir=output_dir)
+    with multiprocessing.Pool(processes) as pool:
+        return pool.map(worker, idl_paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ROS2 IDL files to JSON")
+    parser.add_argument(
+        "idl_files",
+        nargs="+",
+        metavar="idl-file",
+        help="IDL file(s) to convert"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Convert many files in parallel, writing one JSON file per IDL file"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        help="With --batch, write <output-dir>/<pkg>/<kind>/<stem>.json "
+        "instead of next to each IDL file"
+    )
+    args = parser.parse_args()
+    if not args.batch and (len(args.idl_files) > 1 or args.output_dir is not None):
+        parser.error("multiple files and --output-dir require --batch")
 
     try:
-        json_data = idl_to_json(idl_file)
-        print(json.dumps(json_data, indent=2))
+        if args.batch:
+            for output_path in write_json_files(args.idl_files, args.output_dir):
+                print(output_path)
+        else:
+            dump_json(load_idl(args.idl_files[0]), sys.stdout)
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         import traceback